@@ -13,10 +13,13 @@ class Config:
     """系统配置"""
     
     # 串口配置
+    # SERIAL_TIMEOUT 是阻塞读取的空闲返回间隔: 有数据立即返回，
+    # 空闲时最多阻塞这么久再检查退出标志
     SERIAL_PORT: str = "/dev/ttyUSB0"
     SERIAL_BAUDRATE: int = 115200
     SERIAL_TIMEOUT: float = 0.1
-    
+    SERIAL_LOW_LATENCY: bool = True
+
     # WebSocket 配置
     WS_SERVER_URL: str = "https://exmeaningsmartdoor.zeabur.app"
     DEVICE_TOKEN: str = "smartdoor_exmeaning"
@@ -46,6 +49,7 @@ def load_config() -> Config:
         SERIAL_PORT=os.getenv("SERIAL_PORT", "/dev/ttyUSB0"),
         SERIAL_BAUDRATE=int(os.getenv("SERIAL_BAUDRATE", "115200")),
         SERIAL_TIMEOUT=float(os.getenv("SERIAL_TIMEOUT", "0.1")),
+        SERIAL_LOW_LATENCY=os.getenv("SERIAL_LOW_LATENCY", "1") == "1",
         WS_SERVER_URL=os.getenv("WS_SERVER_URL", "https://exmeaningsmartdoor.zeabur.app"),
         DEVICE_TOKEN=os.getenv("DEVICE_TOKEN", "smartdoor_exmeaning"),
         FACE_WINDOW_SECONDS=float(os.getenv("FACE_WINDOW_SECONDS", "5.0")),
@@ -3,6 +3,7 @@
 import time
 import threading
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from .config import Config
@@ -28,7 +29,8 @@ class SmartDoorController:
         self._k230 = K230Serial(
             port=config.SERIAL_PORT,
             baudrate=config.SERIAL_BAUDRATE,
-            timeout=config.SERIAL_TIMEOUT
+            timeout=config.SERIAL_TIMEOUT,
+            low_latency=config.SERIAL_LOW_LATENCY
         )
         
         self._ws = WebSocketClient(
@@ -45,8 +47,22 @@ class SmartDoorController:
         
         # 状态
         self._door_status = DoorStatus.CLOSED
-        self._close_timer: Optional[threading.Timer] = None
+        # 自动关门截止时刻 (time.monotonic 基准)，0 表示未排定；
+        # 由定时器线程检查，不再为每次开门起一个 threading.Timer
+        self._close_deadline = 0.0
         self._timer_thread: Optional[threading.Thread] = None
+        # 定时器唤醒事件: 新识别窗口开启等需要重排到期点时置位
+        self._timer_wake = threading.Event()
+        # 状态上报去重: 记录最近一次上报的状态与时刻
+        self._last_reported_status: Optional[DoorStatus] = None
+        self._last_report_time = 0.0
+
+        # 后台任务线程池: 电机转动/人脸注册等复用两个常驻工作线程，
+        # 不再每条命令临时起一个线程
+        self._exec = ThreadPoolExecutor(
+            max_workers=2,
+            thread_name_prefix="SmartDoor"
+        )
 
         # 电机控制
         self._motor = StepperMotor(
@@ -119,11 +135,9 @@ class SmartDoorController:
         logger.info("SmartDoor 控制器停止中...")
         
         self._running = False
-        
-        # 取消关门定时器
-        if self._close_timer:
-            self._close_timer.cancel()
-        
+        self._close_deadline = 0.0
+        self._timer_wake.set()  # 立即唤醒定时器线程以便退出
+
         # 停止 K230 (如果已连接)
         if getattr(self, '_k230_connected', False):
             try:
@@ -138,30 +152,68 @@ class SmartDoorController:
         # 等待定时器线程
         if self._timer_thread:
             self._timer_thread.join(timeout=2.0)
+
+        # 关闭工作线程池（不等待未完成的电机动作）
+        self._exec.shutdown(wait=False, cancel_futures=True)
         
         logger.info("SmartDoor 控制器已停止")
     
     def _timer_loop(self):
-        """定时器循环"""
+        """定时器循环
+
+        事件驱动: 计算最近的到期点（识别窗口超时 / 下次状态上报），
+        休眠到该时刻或被 _timer_wake 唤醒，不再固定 0.5s 轮询
+        """
         STATUS_INTERVAL = 30  # 状态上报间隔
         last_status_time = 0
-        
+
         while self._running:
             # 检查识别超时
             self._face_manager.check_timeout()
-            
+
+            # 自动关门到期检查（单调时钟，不受系统时间调整影响）
+            if self._close_deadline and time.monotonic() >= self._close_deadline:
+                self._close_deadline = 0.0
+                self._close_door()
+
             # 定期上报状态
             now = time.time()
             if now - last_status_time >= STATUS_INTERVAL:
                 self._report_status()
                 last_status_time = now
-            
-            time.sleep(0.5)
+
+            # 下一个到期点: 识别窗口截止时刻与下次状态上报中较早者
+            deadline = last_status_time + STATUS_INTERVAL
+            face_deadline = self._face_manager.next_deadline()
+            if face_deadline is not None and face_deadline < deadline:
+                deadline = face_deadline
+
+            timeout = max(0.05, deadline - time.time())
+            if self._close_deadline:
+                timeout = min(
+                    timeout,
+                    max(0.05, self._close_deadline - time.monotonic())
+                )
+            self._timer_wake.wait(timeout=timeout)
+            self._timer_wake.clear()
     
-    def _report_status(self):
-        """上报状态"""
+    def _report_status(self, force: bool = False):
+        """上报状态
+
+        1 秒内重复上报相同状态时直接跳过（开/关门与定时器可能背靠背
+        触发）；force=True 用于远程 REFRESH 等必须立即上报的场景
+        """
+        status = self._door_status
+        now = time.time()
+        if (not force
+                and status == self._last_reported_status
+                and now - self._last_report_time < 1.0):
+            return
+
+        self._last_reported_status = status
+        self._last_report_time = now
         self._ws.report_door_status(
-            self._door_status,
+            status,
             {"testAngle": self.config.MOTOR_OPEN_ANGLE}
         )
     
@@ -169,12 +221,16 @@ class SmartDoorController:
     
     def _on_face_detection(self, detection: FaceDetection):
         """人脸检测回调"""
-        self._face_manager.on_face_detected(detection)
-    
+        if self._face_manager.on_face_detected(detection):
+            # 新窗口开启，唤醒定时器重算到期点
+            self._timer_wake.set()
+
     def _on_face_recognition(self, recognition: FaceRecognition):
         """人脸识别回调"""
-        logger.debug(f"识别: {recognition.name} ({recognition.score}%)")
-        self._face_manager.on_recognition_result(recognition)
+        # %-style 延迟格式化: 日志级别高于 DEBUG 时不做任何字符串拼接
+        logger.debug("识别: %s (%d%%)", recognition.name, recognition.score)
+        if self._face_manager.on_recognition_result(recognition):
+            self._timer_wake.set()
     
     # ==================== 识别结果处理 ====================
     
@@ -219,16 +275,12 @@ class SmartDoorController:
         elif cmd == "REGISTER_FACE":
             user_id = data.get("user_id", "")
             if user_id:
-                threading.Thread(
-                    target=self._register_face,
-                    args=(user_id,),
-                    daemon=True
-                ).start()
+                self._exec.submit(self._register_face, user_id)
             else:
                 self._ws.report_log(LogType.SYSTEM, "注册失败: 未提供用户ID")
         
         elif cmd == "REFRESH":
-            self._report_status()
+            self._report_status(force=True)
             
         elif cmd == "ROTATE":
             try:
@@ -239,12 +291,8 @@ class SmartDoorController:
                     
                     direction_str = "顺时针" if cw else "逆时针"
                     self._ws.report_log(LogType.SYSTEM, f"测试转动: {abs_angle}° {direction_str}")
-                    
-                    threading.Thread(
-                        target=self._motor.rotate,
-                        args=(abs_angle, cw),
-                        daemon=True
-                    ).start()
+
+                    self._exec.submit(self._motor.rotate, abs_angle, cw)
                 else:
                     self._ws.report_log(LogType.SYSTEM, "转动角度不能为0")
             except ValueError:
@@ -277,41 +325,27 @@ class SmartDoorController:
     def _open_door(self):
         """开门"""
         logger.info("🚪 开门")
-        
-        # 取消之前的关门定时器
-        if self._close_timer:
-            self._close_timer.cancel()
-        
+
         self._door_status = DoorStatus.OPEN
         self._report_status()
-        
+
         # Motor Open (CW)
-        threading.Thread(
-            target=self._motor.rotate,
-            args=(self.config.MOTOR_OPEN_ANGLE, True),
-            daemon=True
-        ).start()
-        
-        # 自动关门
-        self._close_timer = threading.Timer(
-            self.config.AUTO_CLOSE_DELAY,
-            self._close_door
-        )
-        self._close_timer.start()
-    
+        self._exec.submit(self._motor.rotate, self.config.MOTOR_OPEN_ANGLE, True)
+
+        # 排定自动关门（重复开门只是顺延截止时刻），唤醒定时器重算等待
+        self._close_deadline = time.monotonic() + self.config.AUTO_CLOSE_DELAY
+        self._timer_wake.set()
+
     def _close_door(self):
         """关门"""
         logger.info("🚪 关门")
-        
+
+        self._close_deadline = 0.0  # 远程提前关门时撤销自动关门
         self._door_status = DoorStatus.CLOSED
         self._report_status()
         
         # Motor Close (CCW)
-        threading.Thread(
-            target=self._motor.rotate,
-            args=(self.config.MOTOR_OPEN_ANGLE, False),
-            daemon=True
-        ).start()
+        self._exec.submit(self._motor.rotate, self.config.MOTOR_OPEN_ANGLE, False)
     
     # ==================== 人脸注册 ====================
     
@@ -320,10 +354,10 @@ class SmartDoorController:
         logger.info(f"开始注册: {user_id}")
         self._ws.report_log(LogType.SYSTEM, f"开始注册: {user_id}")
         
-        # 停止当前功能
+        # 停止当前功能（send_command 同步等待 K230 的 ACK，
+        # 响应返回即表示固件已完成切换，无需再额外定时等待）
         self._k230.stop_function()
-        time.sleep(0.5)
-        
+
         # 执行注册
         success = self._k230.register_face(user_id)
         
@@ -335,5 +369,4 @@ class SmartDoorController:
             self._ws.report_log(LogType.SYSTEM, f"注册失败: {user_id}")
         
         # 恢复人脸识别
-        time.sleep(0.5)
         self._k230.start_function(K230Function.FACE_RECOGNITION)
\ No newline at end of file
@@ -27,4 +27,10 @@ class K230ResponseStatus(Enum):
     """K230 响应状态"""
     OK = "OK"
     PONG = "PONG"
-    ERR = "ERR"
\ No newline at end of file
+    ERR = "ERR"
+
+
+# 枚举 → 线上字符串的预计算映射: 上报热路径用一次 dict 查找
+# 代替 Enum 的 .value 描述符访问
+DOOR_STATUS_STR = {s: s.value for s in DoorStatus}
+LOG_TYPE_STR = {t: t.value for t in LogType}
\ No newline at end of file
@@ -11,10 +11,11 @@ from .protocol import FaceDetection, FaceRecognition
 logger = logging.getLogger("SmartDoor.Face")
 
 
-@dataclass
+@dataclass(slots=True)
 class RecognitionWindow:
     """识别窗口状态"""
     start_time: float = 0.0
+    deadline: float = 0.0  # start_time + 窗口时长，开窗时一次算好
     active: bool = False
     success_reported: bool = False
     failure_count: int = 0
@@ -61,46 +62,73 @@ class FaceRecognitionManager:
     
     def _start_window(self):
         """开启新窗口"""
+        now = time.time()
         self._window = RecognitionWindow(
-            start_time=time.time(),
+            start_time=now,
+            deadline=now + self.window_duration,
             active=True
         )
         logger.debug("开启识别窗口")
-    
+
     def _is_window_expired(self) -> bool:
         """窗口是否已过期"""
         if not self._window.active:
             return True
-        return (time.time() - self._window.start_time) >= self.window_duration
+        return time.time() >= self._window.deadline
     
-    def on_face_detected(self, detection: FaceDetection):
+    def next_deadline(self) -> Optional[float]:
+        """当前识别窗口的到期时刻 (time.time 基准)
+
+        无活跃窗口时返回 None。供调用方计算定时器的下一个唤醒点。
+        """
+        window = self._window
+        return window.deadline if window.active else None
+
+    def on_face_detected(self, detection: FaceDetection) -> bool:
         """
         处理人脸检测事件
-        
+
         检测到人脸时，如果没有活跃窗口则开启新窗口
+
+        Returns:
+            是否开启了新窗口（调用方可据此重排定时器）
         """
+        # 无锁快速路径: 检测帧按摄像头帧率到达，绝大多数只是命中已开启的窗口，
+        # 无需加锁即可丢弃（窗口激活与否由下方加锁后再次确认）
+        if self._window.active:
+            return False
+
         with self._lock:
             if not self._window.active:
                 self._start_window()
+                return True
+
+        return False
     
-    def on_recognition_result(self, recognition: FaceRecognition):
+    def on_recognition_result(self, recognition: FaceRecognition) -> bool:
         """
         处理识别结果
-        
+
         Args:
             recognition: 识别结果
+
+        Returns:
+            是否开启了新窗口（调用方可据此重排定时器）
         """
+        new_window = False
+
         with self._lock:
             # 检查窗口是否过期
             if self._is_window_expired():
                 # 先处理旧窗口的失败
-                if (self._window.active and 
-                    not self._window.success_reported and 
+                if (self._window.active and
+                    not self._window.success_reported and
                     self._window.failure_count > 0):
                     self._report_reject()
-                
+
                 # 开启新窗口
                 self._start_window()
+                new_window = True
             
             # 保存最后一次识别
             self._window.last_recognition = recognition
@@ -120,13 +148,21 @@ class FaceRecognitionManager:
             else:
                 # 失败计数
                 self._window.failure_count += 1
-    
+
+        return new_window
+
     def check_timeout(self):
         """
         检查窗口超时
-        
+
         应该在定时器中周期性调用
         """
+        # 无锁快速路径: 窗口对象整体替换从不原地复活，读到的快照若
+        # 未激活或未到期，加锁后也必然得出同样结论，直接返回即可
+        window = self._window
+        if not window.active or time.time() < window.deadline:
+            return
+
         with self._lock:
             if self._window.active and self._is_window_expired():
                 if not self._window.success_reported and self._window.failure_count > 0:
@@ -135,7 +171,7 @@ class FaceRecognitionManager:
     
     def _report_success(self, user_id: str):
         """报告识别成功"""
-        logger.info(f"✓ 识别成功: {user_id}")
+        logger.info("✓ 识别成功: %s", user_id)
         try:
             self.on_success(user_id, self._window.last_recognition)
         except Exception as e:
@@ -143,7 +179,7 @@ class FaceRecognitionManager:
     
     def _report_reject(self):
         """报告识别失败"""
-        logger.info(f"✗ 识别失败: {self._window.failure_count} 次尝试")
+        logger.info("✗ 识别失败: %d 次尝试", self._window.failure_count)
         try:
             self.on_reject(
                 self._window.failure_count, 
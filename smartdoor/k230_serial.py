@@ -1,37 +1,83 @@
-"""K230 串口通信模块"""
+"""K230 串口通信模块
 
+线程模型: 一个读取线程（只收字节、入队）+ 一个处理线程（分帧/解析/回调），
+命令发送在调用方线程同步等待响应。
+
+曾评估迁移到 asyncio + pyserial-asyncio: WebSocket 客户端（python-socketio
+同步模式）和电机控制都是阻塞式线程模型，单独异步化串口只会在两种并发模型
+之间增加桥接开销，因此维持线程模型。
+"""
+
+import os
+import re
 import serial
+import selectors
 import threading
 import time
 import logging
-from queue import Queue, Empty
+from queue import SimpleQueue
 from typing import Optional, Callable, List
 
 from .protocol import (
-    K230Protocol, 
-    K230Response, 
-    FaceDetection, 
-    FaceRecognition
+    K230Protocol,
+    K230Response,
+    FaceDetection,
+    FaceRecognition,
+    MSG_RESPONSE,
+    MSG_FACE_DETECTION,
+    MSG_FACE_RECOGNITION,
+    CMD_PING,
+    CMD_STATUS,
+    CMD_STOP,
+    CMD_LIST,
+    CMD_RELOAD,
+    CMD_START_FACE_DETECTION,
+    CMD_START_FACE_RECOGNITION
 )
 from .enums import K230Function
 
 logger = logging.getLogger("SmartDoor.K230")
 
+# 帧定界符（分帧热路径使用的模块级常量）
+_FRAME_START = b'$'
+# 完整帧模式: finditer 一次 C 级扫描取出缓冲区内所有完整帧，
+# 多帧突发时比逐帧 find+切片快得多
+_FRAME_RE = re.compile(rb'\$[^#]*#')
+
 
 class K230Serial:
     """K230 串口通信管理器"""
     
-    def __init__(self, port: str, baudrate: int, timeout: float = 0.1):
+    def __init__(
+        self,
+        port: str,
+        baudrate: int,
+        timeout: float = 0.1,
+        low_latency: bool = True
+    ):
         self.port = port
         self.baudrate = baudrate
         self.timeout = timeout
+        self.low_latency = low_latency
         
         self._serial: Optional[serial.Serial] = None
+        self._fd: Optional[int] = None  # 原始文件描述符，连接后缓存
+        # 停止管道: disconnect 写一字节立即唤醒 select 中的读取线程
+        self._stop_r: Optional[int] = None
+        self._stop_w: Optional[int] = None
         self._running = False
-        self._rx_buffer = ""
-        self._response_queue: Queue = Queue()
+        self._rx_buffer = bytearray()
+        # 响应槽: 命令-响应是严格一问一答（send_command 持锁期间最多一个
+        # 未决命令），单槽 + Event 比 Queue 少一层锁和对象开销
+        self._response_slot: Optional[K230Response] = None
+        self._response_event = threading.Event()
         self._lock = threading.Lock()
         self._read_thread: Optional[threading.Thread] = None
+
+        # 读取线程只负责收字节，解析/回调在独立处理线程执行，
+        # 避免慢回调（GPIO、日志 I/O）拖住串口读取导致丢字节
+        self._rx_queue: SimpleQueue = SimpleQueue()
+        self._process_thread: Optional[threading.Thread] = None
         
         # 回调函数
         self.on_face_detection: Optional[Callable[[FaceDetection], None]] = None
@@ -40,6 +86,24 @@ class K230Serial:
         # 调试计数
         self._rx_count = 0
         self._msg_count = 0
+
+        # 预构建命令缓存: 固定参数的常用命令直接取导入时构建好的字节
+        self._cmd_cache = {
+            ("PING",): CMD_PING,
+            ("STATUS",): CMD_STATUS,
+            ("STOP",): CMD_STOP,
+            ("LIST",): CMD_LIST,
+            ("RELOAD",): CMD_RELOAD,
+            ("START", int(K230Function.FACE_DETECTION)): CMD_START_FACE_DETECTION,
+            ("START", int(K230Function.FACE_RECOGNITION)): CMD_START_FACE_RECOGNITION,
+        }
+
+        # 分发表: 以消息类型编码为下标，避免逐个字符串比较
+        self._dispatch_table = (
+            self._handle_response,       # MSG_RESPONSE
+            self._handle_face_detection,  # MSG_FACE_DETECTION
+            self._handle_face_recognition,  # MSG_FACE_RECOGNITION
+        )
     
     @property
     def is_connected(self) -> bool:
@@ -59,14 +123,41 @@ class K230Serial:
             )
             self._serial.reset_input_buffer()
             self._serial.reset_output_buffer()
-            
+
+            # 降低 USB 串口延迟
+            # FTDI/CH340 转接器默认有 16ms 缓冲定时器，短帧会被整段延迟；
+            # set_low_latency_mode 通过 TIOCSSERIAL 设置 ASYNC_LOW_LATENCY (1ms)
+            if self.low_latency:
+                try:
+                    self._serial.set_low_latency_mode(True)
+                    logger.debug("串口低延迟模式已启用")
+                except Exception as e:
+                    logger.debug(f"低延迟模式不可用: {e}")
+
+            # 缓存原始 fd: 命令发送直接 os.write，绕过 pyserial 的
+            # 封装层和 flush（termios 无输出缓冲，write 即入内核队列）
+            try:
+                self._fd = self._serial.fileno()
+            except Exception:
+                self._fd = None
+
+            self._stop_r, self._stop_w = os.pipe()
+
+
             self._running = True
             self._read_thread = threading.Thread(
-                target=self._read_loop, 
+                target=self._read_loop,
                 daemon=True,
                 name="K230-Reader"
             )
             self._read_thread.start()
+
+            self._process_thread = threading.Thread(
+                target=self._process_loop,
+                daemon=True,
+                name="K230-Processor"
+            )
+            self._process_thread.start()
             
             time.sleep(0.5)  # 等待串口稳定
             logger.info(f"K230 串口已连接: {self.port} @ {self.baudrate}")
@@ -80,10 +171,28 @@ class K230Serial:
     def disconnect(self):
         """断开连接"""
         self._running = False
-        
+
         if self._read_thread:
+            if self._stop_w is not None:
+                try:
+                    os.write(self._stop_w, b'x')  # 立即唤醒 select
+                except OSError:
+                    pass
             self._read_thread.join(timeout=2.0)
             self._read_thread = None
+
+        for fd in (self._stop_r, self._stop_w):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._stop_r = self._stop_w = None
+
+        if self._process_thread:
+            self._rx_queue.put(None)  # 停止哨兵
+            self._process_thread.join(timeout=2.0)
+            self._process_thread = None
         
         if self._serial:
             try:
@@ -91,101 +200,182 @@ class K230Serial:
             except:
                 pass
             self._serial = None
+            self._fd = None
         
         logger.info("K230 串口已断开")
     
     def _read_loop(self):
-        """串口读取循环"""
+        """串口读取循环
+
+        selectors 同时监听串口 fd 和停止管道: 空闲时无任何唤醒，
+        disconnect() 写停止管道即可立即结束线程，无需等超时到期
+        """
         logger.debug("读取线程已启动")
-        
-        while self._running and self._serial:
-            try:
-                if self._serial.in_waiting > 0:
-                    data = self._serial.read(self._serial.in_waiting)
-                    text = data.decode('utf-8', errors='ignore')
+
+        fd = self._fd
+        if fd is None:
+            self._read_loop_fallback()
+            return
+
+        sel = selectors.DefaultSelector()
+        sel.register(fd, selectors.EVENT_READ)
+        sel.register(self._stop_r, selectors.EVENT_READ)
+
+        # 局部绑定: 循环体内 LOAD_FAST 代替逐次 self.X 属性查找
+        stop_r = self._stop_r
+        select = sel.select
+        read = os.read
+        enqueue = self._rx_queue.put
+        debug_enabled = logger.isEnabledFor
+
+        try:
+            while self._running:
+                for key, _ in select():
+                    if key.fd == stop_r:
+                        read(stop_r, 64)
+                        return
+                    try:
+                        data = read(fd, 4096)
+                    except OSError as e:
+                        if self._running:
+                            logger.error(f"串口读取错误: {e}")
+                        time.sleep(0.1)
+                        continue
+                    if not data:
+                        continue
+
                     self._rx_count += len(data)
-                    
-                    # 添加原始数据日志
-                    logger.debug(f"[RX] 原始数据({len(data)}字节): {repr(text)}")
-                    
-                    self._process_data(text)
-                else:
-                    time.sleep(0.01)
+
+                    # 原始数据日志: repr 开销不小，仅在 DEBUG 生效时才构造
+                    if debug_enabled(logging.DEBUG):
+                        logger.debug("[RX] 原始数据(%d字节): %r", len(data), data)
+
+                    # 只入队，解析交给处理线程
+                    enqueue(data)
+        finally:
+            sel.close()
+            logger.debug("读取线程已退出")
+
+    def _read_loop_fallback(self):
+        """阻塞读取循环（fileno 不可用时的后备路径）"""
+        ser = self._serial
+        enqueue = self._rx_queue.put
+
+        while self._running and ser.is_open:
+            try:
+                # 阻塞读取: 有数据立即返回，空闲时最多阻塞 timeout 秒
+                data = ser.read(4096)
+                if not data:
+                    continue
+
+                self._rx_count += len(data)
+
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[RX] 原始数据(%d字节): %r", len(data), data)
+
+                enqueue(data)
             except Exception as e:
                 if self._running:
                     logger.error(f"串口读取错误: {e}")
                 time.sleep(0.1)
-        
+
         logger.debug("读取线程已退出")
     
-    def _process_data(self, data: str):
-        """处理接收数据"""
-        self._rx_buffer += data
-        
-        # 显示缓冲区状态
-        logger.debug(f"[BUFFER] 当前缓冲区: {repr(self._rx_buffer)}")
-        
+    def _process_loop(self):
+        """数据处理循环（消费读取线程入队的原始字节）"""
+        logger.debug("处理线程已启动")
+
         while True:
-            # 查找消息起始
-            start = self._rx_buffer.find('$')
-            if start == -1:
-                if self._rx_buffer:
-                    logger.debug(f"[BUFFER] 丢弃无效数据: {repr(self._rx_buffer)}")
-                self._rx_buffer = ""
+            data = self._rx_queue.get()
+            if data is None:  # 停止哨兵
                 break
-            
-            # 丢弃起始符之前的数据
-            if start > 0:
-                logger.debug(f"[BUFFER] 丢弃前缀: {repr(self._rx_buffer[:start])}")
-                self._rx_buffer = self._rx_buffer[start:]
-            
-            # 查找消息结束
-            end = self._rx_buffer.find('#')
-            if end == -1:
-                logger.debug(f"[BUFFER] 等待更多数据, 当前: {repr(self._rx_buffer)}")
-                break
-            
-            # 提取完整消息
-            message = self._rx_buffer[:end + 1]
-            self._rx_buffer = self._rx_buffer[end + 1:]
+            try:
+                self._process_data(data)
+            except Exception as e:
+                logger.error(f"数据处理错误: {e}")
+
+        logger.debug("处理线程已退出")
+
+    def _process_data(self, data: bytes):
+        """处理接收数据（正则一次扫描提取缓冲区内所有完整帧）"""
+        # bytearray 原地扩展/删除: 不像 bytes += 那样每次整段重新分配
+        self._rx_buffer.extend(data)
+
+        # 显示缓冲区状态（热路径日志统一用 %-style 延迟格式化）
+        debug_on = logger.isEnabledFor(logging.DEBUG)
+        if debug_on:
+            logger.debug("[BUFFER] 当前缓冲区: %r", self._rx_buffer)
+
+        # 同批多个检测帧只保留最新一帧（旧帧的位置信息已过期）
+        pending_detection: Optional[tuple] = None
+
+        last_end = 0
+        for match in _FRAME_RE.finditer(self._rx_buffer):
+            last_end = match.end()
             self._msg_count += 1
-            
-            logger.debug(f"[MSG #{self._msg_count}] 完整消息: {message}")
-            
+
+            # 直接以字节解析: 人脸帧免整帧解码，仅用户名按需 UTF-8
+            frame = match.group(0)
+            if debug_on:
+                logger.debug("[MSG #%d] 完整消息: %r", self._msg_count, frame)
+
             # 解析并分发
-            parsed = K230Protocol.parse_message(message)
+            parsed = K230Protocol.parse_frame(frame)
             if parsed:
-                logger.debug(f"[MSG #{self._msg_count}] 解析结果: type={parsed.get('type')}")
-                self._dispatch_message(parsed)
+                if debug_on:
+                    logger.debug("[MSG #%d] 解析结果: type=%d", self._msg_count, parsed[0])
+                if parsed[0] == MSG_FACE_DETECTION:
+                    pending_detection = parsed
+                else:
+                    self._dispatch_message(parsed)
             else:
-                logger.warning(f"[MSG #{self._msg_count}] 解析失败: {message}")
+                logger.warning("[MSG #%d] 解析失败: %r", self._msg_count, frame)
+
+        if last_end:
+            del self._rx_buffer[:last_end]
+
+        # 残余不含起始符则整体丢弃（半帧保留，等待后续字节补全）
+        if self._rx_buffer and self._rx_buffer.find(_FRAME_START) == -1:
+            if debug_on:
+                logger.debug("[BUFFER] 丢弃无效数据: %r", self._rx_buffer)
+            del self._rx_buffer[:]
+
+        if pending_detection is not None:
+            self._dispatch_message(pending_detection)
     
-    def _dispatch_message(self, parsed: dict):
-        """分发消息"""
-        msg_type = parsed.get("type")
-        
-        if msg_type == "response":
-            response = parsed["response"]
-            logger.debug(f"[DISPATCH] 响应入队: status={response.status.value}, data={response.data}")
-            self._response_queue.put(response)
-            logger.debug(f"[DISPATCH] 队列大小: {self._response_queue.qsize()}")
-        
-        elif msg_type == "face_detection":
-            logger.debug(f"[DISPATCH] 人脸检测")
-            if self.on_face_detection:
-                try:
-                    self.on_face_detection(parsed["data"])
-                except Exception as e:
-                    logger.error(f"人脸检测回调错误: {e}")
-        
-        elif msg_type == "face_recognition":
-            data = parsed["data"]
-            logger.debug(f"[DISPATCH] 人脸识别: {data.name} ({data.score}%)")
-            if self.on_face_recognition:
-                try:
-                    self.on_face_recognition(data)
-                except Exception as e:
-                    logger.error(f"人脸识别回调错误: {e}")
+    def _dispatch_message(self, parsed: tuple):
+        """分发消息（按类型编码查分发表）"""
+        msg_type, payload = parsed
+        self._dispatch_table[msg_type](payload)
+
+    def _handle_response(self, response: K230Response):
+        """处理响应消息"""
+        logger.debug("[DISPATCH] 收到响应: status=%s, data=%s",
+                     response.status.value, response.data)
+        self._response_slot = response
+        self._response_event.set()
+
+    def _handle_face_detection(self, detection: FaceDetection):
+        """处理人脸检测数据"""
+        logger.debug("[DISPATCH] 人脸检测")
+        # 先取快照再调用: 属性只读一次，期间被并发改为 None 也不会炸
+        callback = self.on_face_detection
+        if callback:
+            try:
+                callback(detection)
+            except Exception as e:
+                logger.error(f"人脸检测回调错误: {e}")
+
+    def _handle_face_recognition(self, recognition: FaceRecognition):
+        """处理人脸识别数据"""
+        logger.debug("[DISPATCH] 人脸识别: %s (%d%%)",
+                     recognition.name, recognition.score)
+        callback = self.on_face_recognition
+        if callback:
+            try:
+                callback(recognition)
+            except Exception as e:
+                logger.error(f"人脸识别回调错误: {e}")
     
     def send_command(
         self, 
@@ -204,38 +394,45 @@ class K230Serial:
                 logger.error("读取线程已死亡!")
                 return None
             
-            # 清空旧响应
-            old_count = 0
-            while not self._response_queue.empty():
-                try:
-                    self._response_queue.get_nowait()
-                    old_count += 1
-                except Empty:
-                    break
-            if old_count > 0:
-                logger.debug(f"清空旧响应: {old_count}个")
-            
-            # 构建并发送命令
-            command = K230Protocol.build_command(cmd, *args)
+            # 丢弃迟到的旧响应: 先清槽再清事件——反序的话，处理线程若在
+            # 两步之间投递旧响应，槽被清掉但事件留在置位态，下方 wait()
+            # 会立即返回并拿到空槽
+            self._response_slot = None
+            self._response_event.clear()
+
+            # 构建并发送命令（常用固定命令命中预构建缓存）
+            command = self._cmd_cache.get((cmd,) + args)
+            if command is None:
+                command = K230Protocol.build_command(cmd, *args)
             logger.info(f"[TX] 发送: {command.decode().strip()}")
             
             try:
-                self._serial.write(command)
-                self._serial.flush()
+                if self._fd is not None:
+                    # pyserial 以 O_NONBLOCK 打开端口，os.write 可能短写；
+                    # 命令只有十几字节，循环补齐剩余部分即可
+                    view = memoryview(command)
+                    while view:
+                        written = os.write(self._fd, view)
+                        view = view[written:]
+                else:
+                    self._serial.write(command)
+                    self._serial.flush()
             except Exception as e:
                 logger.error(f"发送失败: {e}")
                 return None
             
             # 等待响应
-            logger.debug(f"等待响应, 超时={timeout}秒...")
-            try:
-                response = self._response_queue.get(timeout=timeout)
-                logger.info(f"[RX] 响应: status={response.status.value}, data={response.data}")
-                return response
-            except Empty:
-                logger.warning(f"命令超时: {cmd} (队列大小={self._response_queue.qsize()})")
-                logger.warning(f"调试信息: RX总字节={self._rx_count}, 消息数={self._msg_count}")
-                return None
+            logger.debug("等待响应, 超时=%s秒...", timeout)
+            if self._response_event.wait(timeout=timeout):
+                response = self._response_slot
+                # 事件置位但槽为空说明只收到了迟到的旧响应，按超时处理
+                if response is not None:
+                    logger.info(f"[RX] 响应: status={response.status.value}, data={response.data}")
+                    return response
+
+            logger.warning(f"命令超时: {cmd}")
+            logger.warning(f"调试信息: RX总字节={self._rx_count}, 消息数={self._msg_count}")
+            return None
     
     # ==================== 便捷方法 ====================
     
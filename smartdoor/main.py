@@ -4,8 +4,8 @@ SmartDoor 智能门禁系统入口
 """
 
 import sys
-import time
 import signal
+import threading
 
 from .config import load_config, setup_logging
 from .controller import SmartDoorController
@@ -32,33 +32,33 @@ def main() -> int:
     # 创建控制器
     controller = SmartDoorController(config)
     
-    # 信号处理
+    # 退出事件: 信号处理器只负责置位，清理统一走 finally
+    exit_event = threading.Event()
+
     def signal_handler(sig, frame):
         logger.info("\n收到退出信号")
-        controller.stop()
-        sys.exit(0)
-    
+        exit_event.set()
+
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
-    
+
     # 启动
     try:
         if not controller.start():
             logger.error("控制器启动失败")
             return 1
-        
+
         logger.info("按 Ctrl+C 退出")
-        
-        # 主循环
-        while True:
-            time.sleep(1)
-    
+
+        # 主线程阻塞等待退出事件（不做周期性唤醒）
+        exit_event.wait()
+
     except KeyboardInterrupt:
         logger.info("\n收到退出信号")
-    
+
     finally:
         controller.stop()
-    
+
     return 0
 
 
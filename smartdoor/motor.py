@@ -1,11 +1,14 @@
 """步进电机控制模块"""
 
+import os
 import sys
 import time
 import logging
 import threading
 from typing import Optional
 
+# RPi.GPIO 只在模块导入时加载一次
+# 切勿在 rotate/_send_pulses 等热路径函数内 import（每次都会走 sys.modules 查找）
 try:
     import RPi.GPIO as GPIO
     GPIO_AVAILABLE = True
@@ -18,9 +21,72 @@ except ImportError:
     except ImportError:
         GPIO_AVAILABLE = False
 
+# pigpio 可选: 有 pigpiod 时用 DMA 波形发脉冲，时序精度微秒级且不占 CPU
+try:
+    import pigpio
+    PIGPIO_AVAILABLE = True
+except ImportError:
+    PIGPIO_AVAILABLE = False
+
+# lgpio 可选: Pi 5 上 RPi.GPIO/pigpio 均不支持新的 RP1 芯片，
+# lgpio 走内核 gpiochip 字符设备接口，是 Pi 5 的官方推荐库
+try:
+    import lgpio
+    LGPIO_AVAILABLE = True
+except ImportError:
+    LGPIO_AVAILABLE = False
+
+# numpy 可选: 有则向量化构建梯形延迟表，长行程时免去逐步的
+# Python 浮点运算；没有就走纯 Python 路径，结果一致
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 logger = logging.getLogger("SmartDoor.Motor")
 
 
+def _enter_realtime() -> Optional[tuple]:
+    """尽力把当前线程切到 SCHED_FIFO 实时调度
+
+    需要 root 或 CAP_SYS_NICE，失败返回 None，调用方照常运行。
+    返回旧的 (策略, 参数) 供恢复——脉冲线程来自共享线程池，
+    发完脉冲必须还原，不能让池线程长期占着实时优先级
+    """
+    try:
+        old_policy = os.sched_getscheduler(0)
+        old_param = os.sched_getparam(0)
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(80))
+        return old_policy, old_param
+    except (OSError, AttributeError):
+        return None
+
+
+def _exit_realtime(saved: Optional[tuple]):
+    """恢复 _enter_realtime 保存的调度策略"""
+    if saved is None:
+        return
+    try:
+        os.sched_setscheduler(0, saved[0], saved[1])
+    except OSError:
+        pass
+
+
+def _precise_sleep(ns: int):
+    """亚毫秒级精确休眠（纳秒）: sleep 到接近截止点，剩余自旋收尾
+
+    Linux 上 time.sleep 有几十微秒的唤醒误差加调度延迟，250µs 级的
+    半周期直接 sleep 会严重抖动、压低实际脉冲频率；先睡到距截止点
+    约 150µs 处，再用 perf_counter_ns 自旋，脉冲沿误差降到亚微秒级
+    """
+    deadline = time.perf_counter_ns() + ns
+    if ns > 200_000:
+        time.sleep((ns - 150_000) / 1e9)
+    while time.perf_counter_ns() < deadline:
+        pass
+
+
 class StepperMotor:
     """步进电机控制器 (共阴接法)"""
     
@@ -49,14 +115,51 @@ class StepperMotor:
         self.max_delay = max_delay
         
         self._lock = threading.Lock()
-        
-        if GPIO_AVAILABLE:
-            GPIO.setmode(GPIO.BCM)
-            GPIO.setwarnings(False)
-            GPIO.setup(self.pul_pin, GPIO.OUT, initial=GPIO.LOW)
-            GPIO.setup(self.dir_pin, GPIO.OUT, initial=GPIO.LOW)
-        else:
-            logger.warning("RPi.GPIO 不可用，使用模拟模式")
+        self._last_dir: Optional[bool] = None  # 上次写入的方向电平，避免重复写
+        # 延迟表缓存: min/max_delay 初始化后不变，同一脉冲数的行程
+        # （开/关门共用同一角度）直接复用首个行程算好的表
+        self._ramp_cache: dict = {}
+
+        # 优先尝试 pigpio 波形后端（需要 pigpiod 守护进程）
+        self._pi = None
+        if PIGPIO_AVAILABLE:
+            try:
+                pi = pigpio.pi()
+                if pi.connected:
+                    pi.set_mode(self.pul_pin, pigpio.OUTPUT)
+                    pi.set_mode(self.dir_pin, pigpio.OUTPUT)
+                    pi.write(self.pul_pin, 0)
+                    pi.write(self.dir_pin, 0)
+                    self._pi = pi
+                    logger.info("电机使用 pigpio 波形后端 (DMA 定时)")
+                else:
+                    pi.stop()
+            except Exception as e:
+                logger.debug(f"pigpio 不可用: {e}")
+
+        # 次选 lgpio (Pi 5: RP1 不被 pigpio/RPi.GPIO 支持)
+        # Pi 5 旧内核上排针 GPIO 在 gpiochip4，新内核统一为 gpiochip0
+        self._lgpio_handle = None
+        if self._pi is None and LGPIO_AVAILABLE:
+            for chip in (0, 4):
+                try:
+                    handle = lgpio.gpiochip_open(chip)
+                    lgpio.gpio_claim_output(handle, self.pul_pin, 0)
+                    lgpio.gpio_claim_output(handle, self.dir_pin, 0)
+                    self._lgpio_handle = handle
+                    logger.info(f"电机使用 lgpio 后端 (gpiochip{chip})")
+                    break
+                except Exception as e:
+                    logger.debug(f"lgpio gpiochip{chip} 不可用: {e}")
+
+        if self._pi is None and self._lgpio_handle is None:
+            if GPIO_AVAILABLE:
+                GPIO.setmode(GPIO.BCM)
+                GPIO.setwarnings(False)
+                # 通道列表一次初始化两个引脚（RPi.GPIO 原生支持）
+                GPIO.setup([self.pul_pin, self.dir_pin], GPIO.OUT, initial=GPIO.LOW)
+            else:
+                logger.warning("RPi.GPIO 不可用，使用模拟模式")
             
     def rotate(self, angle: float, cw: bool = True):
         """
@@ -74,45 +177,82 @@ class StepperMotor:
         logger.info(f"电机转动: {angle}° {direction_str} ({pulses} 脉冲)")
         
         with self._lock:
-            if GPIO_AVAILABLE:
+            if self._pi is not None:
+                # pigpio 后端: 方向写 + DMA 波形脉冲
+                if cw != self._last_dir:
+                    self._pi.write(self.dir_pin, 1 if cw else 0)
+                    self._last_dir = cw
+                    time.sleep(0.001)
+                self._send_pulses_wave(pulses)
+            elif self._lgpio_handle is not None:
+                # lgpio 后端: 软件定时脉冲，方向写法与 GPIO 路径一致
+                if cw != self._last_dir:
+                    lgpio.gpio_write(self._lgpio_handle, self.dir_pin, 1 if cw else 0)
+                    self._last_dir = cw
+                    time.sleep(0.001)
+                self._send_pulses_lgpio(pulses)
+            elif GPIO_AVAILABLE:
                 # 设置方向
                 # 假设 HIGH 是 CW/Open, LOW 是 CCW/Close，具体根据接线调整
                 # 用户提示 "共阴接法，高电平有效" -> 指的是 PUL/DIR 信号本身高电平有效
                 # 方向电平取决于驱动器定义，暂时假设 HIGH=CW
-                GPIO.output(self.dir_pin, GPIO.HIGH if cw else GPIO.LOW)
-                
-                # 留出方向建立时间
-                time.sleep(0.001)
-                
+                # 方向未变化时跳过写入，省掉一次 GPIO 写和 1ms 建立时间
+                if cw != self._last_dir:
+                    GPIO.output(self.dir_pin, GPIO.HIGH if cw else GPIO.LOW)
+                    self._last_dir = cw
+
+                    # 留出方向建立时间
+                    time.sleep(0.001)
+
                 # 发送脉冲
                 self._send_pulses(pulses)
             else:
                 time.sleep(1.0)  # 模拟转动时间
                 
-    def _send_pulses(self, count: int):
-        """发送脉冲 (带梯形加减速)
-        
+    def _delay_schedule(self, count: int) -> list:
+        """计算梯形加减速的逐步延迟表 (秒)
+
         机制: 梯形加减速 (20% 加速 - 60% 巡航 - 20% 减速)
         控制逻辑: 通过线性改变脉冲频率来实现平滑的速度变化
+
+        整个延迟表一次性算好，脉冲循环里不再有浮点运算、分支和钳位；
+        结果按 count 缓存，重复行程（开门/关门同角度）零计算
         """
-        if count <= 0:
-            return
+        cached = self._ramp_cache.get(count)
+        if cached is not None:
+            return cached
 
         # 1. 计算各阶段步数
         acc_steps = int(count * 0.2)
         dec_steps = int(count * 0.2)
         # 剩余为匀速段，约为 count * 0.6
-        
+
         # 2. 计算频率范围 (Hz)
         # min_delay (最小间隔) -> 最高频率 (巡航速度)
         # max_delay (最大间隔) -> 最低频率 (起步/停止速度)
         # 保护除以零
         min_freq = 1.0 / self.max_delay if self.max_delay > 0 else 500.0
         max_freq = 1.0 / self.min_delay if self.min_delay > 0 else 2000.0
-        
+
+        # numpy 路径: 三段各一次向量运算，与下方纯 Python 路径逐值一致
+        if NUMPY_AVAILABLE:
+            result = np.empty(count, dtype=np.float64)
+            if acc_steps:
+                result[:acc_steps] = 1.0 / np.linspace(min_freq, max_freq, acc_steps)
+            result[acc_steps:count - dec_steps] = 1.0 / max_freq
+            if dec_steps == 1:
+                # 标量路径中 dec_steps=1 时直接取起步频率
+                result[count - 1] = 1.0 / min_freq
+            elif dec_steps:
+                result[count - dec_steps:] = 1.0 / np.linspace(max_freq, min_freq, dec_steps)
+            delays = result.tolist()
+            self._ramp_cache[count] = delays
+            return delays
+
+        delays = []
         for i in range(count):
             current_freq = max_freq  # 默认为巡航频率
-            
+
             if i < acc_steps:
                 # --- 加速段 (前 20%) ---
                 # 频率从 min_freq 线性增加到 max_freq
@@ -121,7 +261,7 @@ class StepperMotor:
                     current_freq = min_freq + (max_freq - min_freq) * progress
                 else:
                     current_freq = min_freq
-                    
+
             elif i >= count - dec_steps:
                 # --- 减速段 (后 20%) ---
                 # 频率从 max_freq 线性减小到 min_freq
@@ -133,23 +273,144 @@ class StepperMotor:
                     current_freq = min_freq + (max_freq - min_freq) * progress
                 else:
                     current_freq = min_freq
-            
+
             # --- 匀速段 (中间 60%) ---
             # 保持 current_freq = max_freq
-            
+
             # 安全限制频率范围
             current_freq = max(min_freq, min(max_freq, current_freq))
-            
-            # 计算当前脉冲延迟
-            delay = 1.0 / current_freq
-            
-            # 生成脉冲 (50% 占空比)
-            GPIO.output(self.pul_pin, GPIO.HIGH)
-            time.sleep(delay / 2)
-            GPIO.output(self.pul_pin, GPIO.LOW)
-            time.sleep(delay / 2)
+
+            delays.append(1.0 / current_freq)
+
+        self._ramp_cache[count] = delays
+        return delays
+
+    def _send_pulses(self, count: int):
+        """发送脉冲 (软件定时路径，带梯形加减速)"""
+        if count <= 0:
+            return
+
+        # 局部绑定: 2kHz 循环里 LOAD_FAST 代替逐次属性/全局查找
+        output = GPIO.output
+        high = GPIO.HIGH
+        low = GPIO.LOW
+        pin = self.pul_pin
+        wait = _precise_sleep
+
+        # 脉冲期间尽力切实时调度，避免被普通负载抢占拉长脉冲沿
+        saved = _enter_realtime()
+        try:
+            # 循环体只剩 GPIO 写 + 精确休眠 (50% 占空比)
+            for delay in self._delay_schedule(count):
+                half_ns = int(delay * 5e8)
+                output(pin, high)
+                wait(half_ns)
+                output(pin, low)
+                wait(half_ns)
+        finally:
+            _exit_realtime(saved)
+
+    def _send_pulses_lgpio(self, count: int):
+        """发送脉冲 (lgpio 软件定时路径，带梯形加减速)"""
+        if count <= 0:
+            return
+
+        handle = self._lgpio_handle
+        write = lgpio.gpio_write
+        pin = self.pul_pin
+        wait = _precise_sleep
+
+        saved = _enter_realtime()
+        try:
+            for delay in self._delay_schedule(count):
+                half_ns = int(delay * 5e8)
+                write(handle, pin, 1)
+                wait(half_ns)
+                write(handle, pin, 0)
+                wait(half_ns)
+        finally:
+            _exit_realtime(saved)
+
+    def _send_pulses_wave(self, count: int):
+        """通过 pigpio 波形链发送脉冲（带梯形加减速）
+
+        加减速段逐脉冲建波形；匀速段只建一个周期，由 wave_chain 的
+        循环计数重复输出。波形长度不再随行程线性增长，绕开 pigpiod
+        的单波形脉冲数上限，也省去为几百个匀速脉冲构造 pulse 对象。
+        DMA 按微秒精度输出，没有 Python 级 sleep 抖动，波形期间 CPU
+        完全空闲
+        """
+        if count <= 0:
+            return
+
+        pi = self._pi
+        bit = 1 << self.pul_pin
+
+        # 分段边界与 _delay_schedule 保持一致
+        acc_steps = int(count * 0.2)
+        dec_steps = int(count * 0.2)
+        cruise_steps = count - acc_steps - dec_steps
+
+        # 与软件路径共用同一份梯形延迟表
+        delays = self._delay_schedule(count)
+
+        def build_wave(delay_slice) -> int:
+            pulses = []
+            for delay in delay_slice:
+                # 半周期微秒数 (50% 占空比)
+                half_us = max(1, int(delay * 5e5))
+                pulses.append(pigpio.pulse(bit, 0, half_us))
+                pulses.append(pigpio.pulse(0, bit, half_us))
+            pi.wave_add_generic(pulses)
+            return pi.wave_create()
+
+        wids = []
+        chain = []
+        try:
+            pi.wave_clear()
+            if acc_steps:
+                wid = build_wave(delays[:acc_steps])
+                wids.append(wid)
+                chain.append(wid)
+            if cruise_steps:
+                # 单周期波形 + 循环计数 (255,0 开始 / 255,1,lo,hi 重复)
+                wid = build_wave(delays[acc_steps:acc_steps + 1])
+                wids.append(wid)
+                chain += [255, 0, wid,
+                          255, 1, cruise_steps & 0xFF, cruise_steps >> 8]
+            if dec_steps:
+                wid = build_wave(delays[count - dec_steps:])
+                wids.append(wid)
+                chain.append(wid)
+
+            pi.wave_chain(chain)
+            while pi.wave_tx_busy():
+                time.sleep(0.005)
+        except Exception as e:
+            logger.error(f"波形发送失败: {e}")
+        finally:
+            for wid in wids:
+                try:
+                    pi.wave_delete(wid)
+                except Exception:
+                    pass
 
     def cleanup(self):
         """清理 GPIO"""
-        if GPIO_AVAILABLE:
+        if self._pi is not None:
+            try:
+                self._pi.wave_clear()
+                self._pi.stop()
+            except Exception:
+                pass
+            self._pi = None
+        elif self._lgpio_handle is not None:
+            try:
+                lgpio.gpio_free(self._lgpio_handle, self.pul_pin)
+                lgpio.gpio_free(self._lgpio_handle, self.dir_pin)
+                lgpio.gpiochip_close(self._lgpio_handle)
+            except Exception:
+                pass
+            self._lgpio_handle = None
+        elif GPIO_AVAILABLE:
             GPIO.cleanup([self.pul_pin, self.dir_pin])
@@ -1,13 +1,63 @@
 """K230 串口协议模块"""
 
+import re
+import sys
+import struct
+import logging
 from dataclasses import dataclass
 from typing import Optional, List
-from .enums import K230ResponseStatus
+from .enums import K230ResponseStatus, K230Function
+
+logger = logging.getLogger("SmartDoor.Protocol")
+
+
+# 消息类型编码
+# 用小整数而非字符串标识消息类型，接收端可直接作为分发表下标
+MSG_RESPONSE = 0
+MSG_FACE_DETECTION = 1
+MSG_FACE_RECOGNITION = 2
+
+
+# ==================== 二进制数据帧（可选，需固件配合） ====================
+# ASCII CSV 帧的每个整数在 K230 侧 itoa、在本侧 atoi，且线上字节数约为
+# 定长二进制的两倍。这里预留二进制格式，固件切换后即可启用:
+#
+#   检测帧: STX(0x02) | type=6(1B) | x,y,w,h (int16 LE)
+#           | checksum(1B, 负载异或) | ETX(0x03)
+#   识别帧: STX(0x02) | type=8(1B) | x,y,w,h (int16 LE)
+#           | name_len(1B) | name (UTF-8) | score(1B, 0-100)
+#           | checksum(1B, 负载异或) | ETX(0x03)
+#
+# 当前固件仍发 ASCII 帧，parse_message 不受影响
+BINARY_STX = 0x02
+BINARY_ETX = 0x03
+_BINARY_DETECTION = struct.Struct('<Bhhhh')  # type + x,y,w,h
+_BINARY_RECOGNITION_HEAD = struct.Struct('<BhhhhB')  # type + x,y,w,h + name_len
+
+
+# 预编译的数据包正则（人脸帧按摄像头帧率到达，是解析热路径）
+# 单次 match 即完成 格式校验 + 字段提取，避免 split 产生的中间列表/字符串
+_RE_FACE_DETECTION = re.compile(
+    r'^\$\d+,06,(-?\d+),(-?\d+),(-?\d+),(-?\d+)#$'
+)
+_RE_FACE_RECOGNITION = re.compile(
+    r'^\$\d+,08,(-?\d+),(-?\d+),(-?\d+),(-?\d+),([^,#]+),(-?\d+)#$'
+)
+
+# 字节级数据包正则: 分帧器直接喂 bytes，人脸帧无需整帧 UTF-8 解码
+_RE_FACE_DETECTION_B = re.compile(
+    rb'^\$\d+,06,(-?\d+),(-?\d+),(-?\d+),(-?\d+)#$'
+)
+_RE_FACE_RECOGNITION_B = re.compile(
+    rb'^\$\d+,08,(-?\d+),(-?\d+),(-?\d+),(-?\d+),([^,#]+),(-?\d+)#$'
+)
 
 
 # ==================== 数据结构 ====================
 
-@dataclass
+# slots: 人脸帧按摄像头帧率到达，去掉每实例 __dict__ 省内存/GC 压力，
+# 属性读取也更快; frozen: 解析结果只读，杜绝回调里的意外改写
+@dataclass(slots=True, frozen=True)
 class FaceDetection:
     """人脸检测结果"""
     x: int
@@ -16,7 +66,7 @@ class FaceDetection:
     h: int
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FaceRecognition:
     """人脸识别结果"""
     x: int
@@ -32,7 +82,7 @@ class FaceRecognition:
         return self.name != "unknown" and self.score > 0
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class K230Response:
     """
     K230 响应结构
@@ -82,6 +132,9 @@ class K230Protocol:
     # 数据包类型标识
     DATA_TYPE_FACE_DETECTION = "06"
     DATA_TYPE_FACE_RECOGNITION = "08"
+
+    # 状态字 → 枚举的查表映射: 一次 dict.get 代替枚举构造 + 异常捕获
+    _STATUS_MAP = {s.value: s for s in K230ResponseStatus}
     
     @staticmethod
     def build_command(cmd: str, *args) -> bytes:
@@ -102,117 +155,273 @@ class K230Protocol:
         return payload.encode('utf-8')
     
     @classmethod
-    def parse_message(cls, data: str) -> Optional[dict]:
+    def parse_binary_frame(cls, frame: bytes) -> Optional[tuple]:
+        """
+        解析二进制数据帧（STX/ETX 定界 + 异或校验）
+
+        一次 struct.unpack 完成全部字段提取，无字符串分割和逐字段 int()。
+        支持人脸检测帧（type=6）和识别帧（type=8，变长用户名按长度
+        前缀提取）；固件默认仍发 ASCII，本方法供切换后使用。
+
+        Returns:
+            同 parse_message 的 (消息类型编码, 数据) 元组，失败返回 None
+        """
+        if len(frame) < 4 or frame[0] != BINARY_STX or frame[-1] != BINARY_ETX:
+            return None
+
+        payload = frame[1:-2]
+        checksum = 0
+        for b in payload:
+            checksum ^= b
+        if checksum != frame[-2]:
+            logger.warning("二进制帧校验失败: %r", frame)
+            return None
+
+        if (len(payload) == _BINARY_DETECTION.size
+                and payload[0] == K230Function.FACE_DETECTION):
+            _, x, y, w, h = _BINARY_DETECTION.unpack(payload)
+            return (MSG_FACE_DETECTION, FaceDetection(x=x, y=y, w=w, h=h))
+
+        head_size = _BINARY_RECOGNITION_HEAD.size
+        if (len(payload) > head_size
+                and payload[0] == K230Function.FACE_RECOGNITION):
+            _, x, y, w, h, name_len = _BINARY_RECOGNITION_HEAD.unpack_from(payload)
+            # 负载 = 头 + 用户名 + 1 字节分数
+            if len(payload) != head_size + name_len + 1:
+                logger.warning("二进制识别帧长度不符: %r", frame)
+                return None
+            name = payload[head_size:head_size + name_len].decode(
+                'utf-8', errors='ignore'
+            )
+            return (
+                MSG_FACE_RECOGNITION,
+                FaceRecognition(
+                    x, y, w, h,
+                    name=sys.intern(name),
+                    score=payload[-1]
+                )
+            )
+
+        return None
+
+    @classmethod
+    def build_binary_frame(cls, payload: bytes) -> bytes:
+        """构建二进制帧（加 STX/ETX 和异或校验，供测试和固件对拍使用）"""
+        checksum = 0
+        for b in payload:
+            checksum ^= b
+        return bytes([BINARY_STX]) + payload + bytes([checksum, BINARY_ETX])
+
+    @classmethod
+    def parse_frame(cls, frame) -> Optional[tuple]:
+        """
+        解析字节级完整帧（分帧器输出直接传入，无需预先解码）
+
+        人脸帧用字节正则原地提取，int() 直接吃 ASCII 数字字节，
+        只有识别帧里的用户名才做 UTF-8 解码；低频的响应帧退回
+        parse_message 的字符串路径。
+
+        Args:
+            frame: 完整帧字节 ($...# 含定界符)
+
+        Returns:
+            同 parse_message 的 (消息类型编码, 数据) 元组
+        """
+        m = _RE_FACE_RECOGNITION_B.match(frame)
+        if m:
+            return (
+                MSG_FACE_RECOGNITION,
+                FaceRecognition(
+                    int(m.group(1)),
+                    int(m.group(2)),
+                    int(m.group(3)),
+                    int(m.group(4)),
+                    name=sys.intern(m.group(5).decode('utf-8', errors='ignore')),
+                    score=int(m.group(6))
+                )
+            )
+
+        m = _RE_FACE_DETECTION_B.match(frame)
+        if m:
+            return (
+                MSG_FACE_DETECTION,
+                FaceDetection(
+                    int(m.group(1)),
+                    int(m.group(2)),
+                    int(m.group(3)),
+                    int(m.group(4))
+                )
+            )
+
+        # 低频帧: 分帧器给出的就是精确帧，无需 strip；字节正则已失配，
+        # 等价的字符串正则必然同样失配，直接走拆分路径
+        return cls._parse_text(bytes(frame).decode('utf-8', errors='ignore'))
+
+    @classmethod
+    def parse_message(cls, data: str) -> Optional[tuple]:
         """
         解析消息
-        
+
         Args:
             data: 原始消息字符串
-        
+
         Returns:
-            解析后的字典，包含 type 和相关数据
-            - {"type": "response", "response": K230Response}
-            - {"type": "face_detection", "data": FaceDetection}
-            - {"type": "face_recognition", "data": FaceRecognition}
+            (消息类型编码, 数据) 元组
+            - (MSG_RESPONSE, K230Response)
+            - (MSG_FACE_DETECTION, FaceDetection)
+            - (MSG_FACE_RECOGNITION, FaceRecognition)
             - None 表示解析失败
         """
         data = data.strip()
-        
-        # 验证消息格式
-        if not data.startswith('$') or not data.endswith('#'):
+
+        # 快速路径：数据包是最高频的消息类型，直接用预编译正则解析
+        m = _RE_FACE_RECOGNITION.match(data)
+        if m:
+            return (
+                MSG_FACE_RECOGNITION,
+                FaceRecognition(
+                    x=int(m.group(1)),
+                    y=int(m.group(2)),
+                    w=int(m.group(3)),
+                    h=int(m.group(4)),
+                    # 同一用户连续多帧被识别时，intern 让重复的名字共享同一
+                    # str 对象，后续字典查找/比较走指针相等的快路径
+                    name=sys.intern(m.group(5)),
+                    score=int(m.group(6))
+                )
+            )
+
+        m = _RE_FACE_DETECTION.match(data)
+        if m:
+            return (
+                MSG_FACE_DETECTION,
+                FaceDetection(
+                    x=int(m.group(1)),
+                    y=int(m.group(2)),
+                    w=int(m.group(3)),
+                    h=int(m.group(4))
+                )
+            )
+
+        return cls._parse_text(data)
+
+    @classmethod
+    def _parse_text(cls, data: str) -> Optional[tuple]:
+        """拆分通用文本帧（响应等低频消息，data 须为精确帧）"""
+        # 验证消息格式（下标比较代替 startswith/endswith 方法调用）
+        if not data or data[0] != '$' or data[-1] != '#':
             return None
-        
+
         content = data[1:-1]  # 去掉 $ 和 #
         parts = content.split(',')
-        
+
         if len(parts) < 2:
             return None
-        
+
         first = parts[0]
-        
+
         # ===== 响应消息 =====
         if first == "RSP":
-            return cls._parse_response(parts)
-        
+            return cls._parse_response(parts, len(data))
+
         # ===== 数据包 =====
         if first.isdigit():
-            return cls._parse_data_packet(parts)
-        
+            return cls._parse_data_packet(parts, len(data))
+
         return None
-    
+
     @classmethod
-    def _parse_response(cls, parts: List[str]) -> Optional[dict]:
+    def _parse_response(cls, parts: List[str], frame_len: int = 0) -> Optional[tuple]:
         """
         解析响应消息
-        
+
         格式: RSP,<len>,<status>,<data...>
         """
         if len(parts) < 3:
             return None
-        
+
         try:
             length = int(parts[1])
-            status_str = parts[2].upper()
-            
-            # 解析状态
-            try:
-                status = K230ResponseStatus(status_str)
-            except ValueError:
-                status = K230ResponseStatus.ERR
-            
+
+            # 利用帧自带的长度字段做完整性校验（协议没有 CRC）
+            # 长度为整帧字符数，如 $RSP,18,PONG,K230# -> 18
+            # 不符通常意味着帧被截断或粘连，仅告警不丢弃
+            if frame_len and length != frame_len:
+                logger.warning("响应长度字段不符: 声明 %d, 实际 %d", length, frame_len)
+
+            # 解析状态: 状态字在线上即为大写，常态一次查表命中；
+            # 偶发大小写不符时再按大写兜底查一次，未知状态按 ERR 处理
+            status = cls._STATUS_MAP.get(parts[2])
+            if status is None:
+                status = cls._STATUS_MAP.get(
+                    parts[2].upper(), K230ResponseStatus.ERR
+                )
+
             resp_data = parts[3:] if len(parts) > 3 else []
             
-            return {
-                "type": "response",
-                "response": K230Response(
+            return (
+                MSG_RESPONSE,
+                K230Response(
                     length=length,
                     status=status,
                     data=resp_data
                 )
-            }
+            )
         except ValueError:
             return None
     
     @classmethod
-    def _parse_data_packet(cls, parts: List[str]) -> Optional[dict]:
+    def _parse_data_packet(cls, parts: List[str], frame_len: int = 0) -> Optional[tuple]:
         """
         解析数据包
-        
+
         人脸检测: <len>,06,<x>,<y>,<w>,<h>
         人脸识别: <len>,08,<x>,<y>,<w>,<h>,<name>,<score>
         """
         try:
-            # length = int(parts[0])  # 长度字段，可用于校验
+            # 长度字段校验（同响应消息，仅告警）
+            length = int(parts[0])
+            if frame_len and length != frame_len:
+                logger.warning("数据包长度字段不符: 声明 %d, 实际 %d", length, frame_len)
+
             data_type = parts[1] if len(parts) > 1 else ""
             
-            # 人脸检测
+            # 人脸检测（map(int, ...) 批量转换数值段，省去逐字段查找 int）
             if data_type == cls.DATA_TYPE_FACE_DETECTION:
                 if len(parts) >= 6:
-                    return {
-                        "type": "face_detection",
-                        "data": FaceDetection(
-                            x=int(parts[2]),
-                            y=int(parts[3]),
-                            w=int(parts[4]),
-                            h=int(parts[5])
-                        )
-                    }
-            
+                    x, y, w, h = map(int, parts[2:6])
+                    return (MSG_FACE_DETECTION, FaceDetection(x, y, w, h))
+
             # 人脸识别
             elif data_type == cls.DATA_TYPE_FACE_RECOGNITION:
                 if len(parts) >= 8:
-                    return {
-                        "type": "face_recognition",
-                        "data": FaceRecognition(
-                            x=int(parts[2]),
-                            y=int(parts[3]),
-                            w=int(parts[4]),
-                            h=int(parts[5]),
-                            name=parts[6],
+                    x, y, w, h = map(int, parts[2:6])
+                    return (
+                        MSG_FACE_RECOGNITION,
+                        FaceRecognition(
+                            x, y, w, h,
+                            name=sys.intern(parts[6]),
                             score=int(parts[7])
                         )
-                    }
+                    )
         except (ValueError, IndexError):
             pass
-        
-        return None
\ No newline at end of file
+
+        return None
+
+
+# ==================== 预构建命令 ====================
+# 固定参数的命令在导入时一次性构建好字节（部分求值），
+# 稳态发送路径不再做字符串格式化和编码
+
+CMD_PING = K230Protocol.build_command("PING")
+CMD_STATUS = K230Protocol.build_command("STATUS")
+CMD_STOP = K230Protocol.build_command("STOP")
+CMD_LIST = K230Protocol.build_command("LIST")
+CMD_RELOAD = K230Protocol.build_command("RELOAD")
+CMD_START_FACE_DETECTION = K230Protocol.build_command(
+    "START", int(K230Function.FACE_DETECTION)
+)
+CMD_START_FACE_RECOGNITION = K230Protocol.build_command(
+    "START", int(K230Function.FACE_RECOGNITION)
+)
\ No newline at end of file
@@ -5,9 +5,16 @@ import time
 import threading
 import logging
 import socketio
+from collections import deque
 from typing import Optional, Callable
 
-from .enums import DoorStatus, LogType
+from .enums import DoorStatus, LogType, DOOR_STATUS_STR, LOG_TYPE_STR
+
+# orjson 可选: C 实现的 JSON 序列化，比标准库快数倍；未安装时用标准库
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # 禁用代理（避免 127.0.0.1:7890 报错）
 os.environ['http_proxy'] = ''
@@ -18,6 +25,22 @@ os.environ['HTTPS_PROXY'] = ''
 logger = logging.getLogger("SmartDoor.WS")
 
 
+class _OrjsonShim:
+    """适配 socketio.Client(json=...) 的 orjson 包装
+
+    engineio 以模块样对象调用 dumps/loads，并可能传入 separators 等
+    标准库参数；orjson 不接受这些参数，忽略即可（orjson 输出本身紧凑）
+    """
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+
+    @staticmethod
+    def loads(data, **kwargs):
+        return orjson.loads(data)
+
+
 class WebSocketClient:
     """
     WebSocket 客户端
@@ -36,12 +59,25 @@ class WebSocketClient:
         
         self._sio: Optional[socketio.Client] = None
         self._connected = False
-        self._should_run = True
+        # 关闭事件: 重连退避等待在它上面，disconnect 置位后立即中断，
+        # 不用等最长 60s 的退避 sleep 自然到期
+        self._shutdown = threading.Event()
         self._reconnect_thread: Optional[threading.Thread] = None
         self._lock = threading.Lock()
-        
+
         # 命令回调
         self.on_command: Optional[Callable[[dict], None]] = None
+
+        # 发送队列: 上报调用只入队，由发送线程在 20ms 合并窗口后统一发出，
+        # 调用方（识别回调、定时器）不再被网络 I/O 阻塞；溢出时丢最旧
+        self._send_queue: deque = deque(maxlen=256)
+        self._send_event = threading.Event()
+        self._flush_thread = threading.Thread(
+            target=self._flush_loop,
+            daemon=True,
+            name="WS-Sender"
+        )
+        self._flush_thread.start()
     
     @property
     def connected(self) -> bool:
@@ -50,10 +86,15 @@ class WebSocketClient:
     
     def _create_client(self) -> socketio.Client:
         """创建 Socket.IO 客户端"""
+        kwargs = {}
+        if orjson is not None:
+            kwargs['json'] = _OrjsonShim
+
         sio = socketio.Client(
             reconnection=False,  # 禁用内置重连，我们自己管理
             logger=False,
-            engineio_logger=False
+            engineio_logger=False,
+            **kwargs
         )
         
         @sio.event
@@ -122,9 +163,9 @@ class WebSocketClient:
                 transports=['websocket', 'polling']
             )
             
-            # 等待连接建立
-            time.sleep(0.5)
-            
+            # 等待连接建立（可被关闭事件打断）
+            self._shutdown.wait(0.5)
+
             return self._connected
             
         except socketio.exceptions.ConnectionError as e:
@@ -136,7 +177,7 @@ class WebSocketClient:
     
     def _schedule_reconnect(self):
         """安排重连"""
-        if not self._should_run:
+        if self._shutdown.is_set():
             return
         
         if self._reconnect_thread and self._reconnect_thread.is_alive():
@@ -154,12 +195,10 @@ class WebSocketClient:
         delays = [1, 2, 5, 10, 30, 60]  # 递增延迟
         retry = 0
         
-        while self._should_run and not self._connected:
+        while not self._shutdown.is_set() and not self._connected:
             delay = delays[min(retry, len(delays) - 1)]
             logger.info(f"将在 {delay} 秒后重连...")
-            time.sleep(delay)
-            
-            if not self._should_run:
+            if self._shutdown.wait(delay):
                 break
             
             retry += 1
@@ -185,8 +224,9 @@ class WebSocketClient:
     
     def disconnect(self):
         """断开连接"""
-        self._should_run = False
+        self._shutdown.set()
         self._connected = False
+        self._send_event.set()  # 唤醒发送线程以便退出
         
         if self._sio:
             try:
@@ -206,54 +246,90 @@ class WebSocketClient:
                 pass
     
     # ==================== 消息发送 ====================
-    
+
+    def _flush_loop(self):
+        """发送循环: 短暂合并窗口内的上报批量出队，逐事件发出
+
+        事件格式与服务端协议保持一致（door_status / report），
+        只在客户端侧合并: 同一批内 door_status 仅发最新一条
+        """
+        while not self._shutdown.is_set():
+            self._send_event.wait(timeout=0.5)
+            self._send_event.clear()
+
+            if not self._send_queue:
+                continue
+
+            # 20ms 合并窗口: 让同一事件触发的多条上报都先入队
+            time.sleep(0.02)
+
+            batch = []
+            while self._send_queue:
+                try:
+                    batch.append(self._send_queue.popleft())
+                except IndexError:
+                    break
+
+            sio = self._sio
+            if not batch or sio is None or not self._connected:
+                continue
+
+            # 同一批内的门状态只有最后一条仍然有效
+            last_status = None
+            for event, data in batch:
+                if event == 'door_status':
+                    last_status = data
+
+            try:
+                for event, data in batch:
+                    if event == 'door_status' and data is not last_status:
+                        continue
+                    sio.emit(event, data)
+            except Exception as e:
+                logger.error(f"批量上报失败: {e}")
+
     def report_door_status(self, status: DoorStatus, extras: dict = None):
-        """上报门状态"""
+        """上报门状态（入队，由发送线程发出）"""
         if not self._connected or not self._sio:
             return
-        
-        try:
-            data = {
-                "door": status.value
-            }
-            if extras:
-                data.update(extras)
-                
-            self._sio.emit('door_status', data)
-            logger.debug(f"上报门状态: {data}")
-        except Exception as e:
-            logger.error(f"上报门状态失败: {e}")
-    
+
+        data = {
+            "door": DOOR_STATUS_STR[status]
+        }
+        if extras:
+            data.update(extras)
+
+        self._send_queue.append(('door_status', data))
+        self._send_event.set()
+        logger.debug("上报门状态入队: %s", data)
+
     def report_log(
-        self, 
-        log_type: LogType, 
-        msg: str, 
+        self,
+        log_type: LogType,
+        msg: str,
         image: str = ""
     ):
         """
-        上报日志
-        
+        上报日志（入队，由发送线程发出）
+
         Args:
             log_type: 日志类型
             msg: 消息内容
-            image: 可选的 base64 图片
+            image: 可选的 JPEG 图片，纯 base64 字符串（不带 data: 前缀，
+                   由本方法统一加前缀，调用方不必自己拼）
         """
         if not self._connected or not self._sio:
             return
-        
-        try:
-            data = {
-                'type': log_type.value,
-                'msg': msg
-            }
-            
-            if image:
-                if not image.startswith('data:'):
-                    data['image'] = f"data:image/jpeg;base64,{image}"
-                else:
-                    data['image'] = image
-            
-            self._sio.emit('report', data)
-            logger.debug(f"上报日志: [{log_type.value}] {msg}")
-        except Exception as e:
-            logger.error(f"上报日志失败: {e}")
\ No newline at end of file
+
+        data = {
+            'type': LOG_TYPE_STR[log_type],
+            'msg': msg
+        }
+
+        if image:
+            # 统一由此处加前缀，省去每次的 startswith 扫描
+            data['image'] = 'data:image/jpeg;base64,' + image
+
+        self._send_queue.append(('report', data))
+        self._send_event.set()
+        logger.debug("上报日志入队: [%s] %s", data['type'], msg)
\ No newline at end of file